@@ -21,8 +21,8 @@ def main(log=None, gemini=None):
         gemini.start_chat()
     except SystemExit:
         log.info("Chat ended successfully.")
-    except:
-        log.critical()
+    except BaseException as e:
+        log.critical(exc=e)
 
 # Removed the if __name__ == "__main__" block because we have a dedicated entry point (run.py)
 # This improves reusability and prevents accidental direct execution
@@ -0,0 +1,205 @@
+"""batch_io.
+This module provides a background engine that batches file writes.
+
+On Linux, queued writes are submitted through `io_uring` (via the optional
+`liburing` package), so one submission covers every write in a batch.
+When `liburing` is unavailable (macOS/Windows, or io_uring is disabled),
+the same engine falls back to `os.write`/`os.pwrite`.
+"""
+
+from concurrent.futures import Future
+import threading
+import queue
+import os
+
+try:
+    import liburing
+except ImportError:
+    liburing = None
+
+
+class IoUringBatchEngine:
+    """IoUringBatchEngine
+    A daemon thread that drains a queue of write jobs and submits them in batches.
+
+    Jobs for the same file descriptor are written in the order they were queued.
+    """
+    def __init__(self, entries: int=64) -> None:
+        """
+        Initializes the engine and starts its worker thread.
+
+        Args:
+            entries (int, optional): The maximum number of writes submitted in one batch. Defaults to 64.
+        """
+        self.entries = entries
+        self._jobs = queue.Queue()
+        self._ring = None
+        if liburing is not None:
+            ring = liburing.Ring()
+            try:
+                liburing.io_uring_queue_init(entries, ring)
+                self._ring = ring
+                self._cqe = liburing.Cqe()
+            except OSError:
+                # io_uring can be disabled by the kernel or a seccomp policy
+                pass
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def backend(self) -> str:
+        """str: "io_uring" when writes go through liburing, "os" otherwise."""
+        return "io_uring" if self._ring is not None else "os"
+
+    def write(self, fd: int, data: bytes, offset: int=None, truncate: bool=False) -> Future:
+        """
+        Queues a write job.
+
+        Args:
+            fd (int): The file descriptor to write to.
+            data (bytes): The bytes to write.
+            offset (int, optional): The file offset to write at. Defaults to None (the current position, or the end with O_APPEND).
+            truncate (bool, optional): Whether to truncate the file right after the written bytes, so they replace its content. Requires an offset. Defaults to False.
+
+        Returns:
+            Future: Resolves to the number of bytes written, or to the OSError raised by the write or truncate.
+        """
+        future = Future()
+        self._jobs.put((fd, data, offset, truncate, future))
+        return future
+
+    def flush(self) -> None:
+        """
+        Blocks until every queued write has completed.
+        """
+        self._jobs.join()
+        return None
+
+    def close(self) -> None:
+        """
+        Flushes pending writes, stops the worker thread and releases the ring.
+        """
+        self.flush()
+        self._jobs.put(None)
+        self._thread.join()
+        if self._ring is not None:
+            liburing.io_uring_queue_exit(self._ring)
+            self._ring = None
+        return None
+
+    def _run(self) -> None:
+        """
+        Worker loop: waits for a job, drains whatever else is queued and submits it as one batch.
+        """
+        running = True
+        while running:
+            batch = [self._jobs.get()]
+            # A truncating write ends the batch: its ftruncate runs once the batch completes,
+            # so no later write may be submitted along with it
+            while len(batch) < self.entries and not self._ends_batch(batch[-1]):
+                try:
+                    batch.append(self._jobs.get_nowait())
+                except queue.Empty:
+                    break
+            jobs = [job for job in batch if job is not None]
+            running = len(jobs) == len(batch)
+            try:
+                if jobs:
+                    try:
+                        if self._ring is not None:
+                            results = self._submit_uring(jobs)
+                        else:
+                            results = self._submit_os(jobs)
+                    except Exception as error:
+                        # Fail the whole batch rather than the worker thread
+                        results = [error] * len(jobs)
+                    for job, result in zip(jobs, results):
+                        self._complete(job, result)
+            finally:
+                # Always mark the jobs done, so flush() and close() cannot hang
+                for _ in batch:
+                    self._jobs.task_done()
+        return None
+
+    @staticmethod
+    def _complete(job, result) -> None:
+        """
+        Runs the truncate of a submitted job and resolves its future.
+
+        Args:
+            job (tuple): The write job.
+            result (int | Exception): The bytes written, or the error raised by the write.
+        """
+        fd, data, offset, truncate, future = job
+        try:
+            if truncate and not isinstance(result, Exception):
+                os.ftruncate(fd, offset + result)
+        except OSError as error:
+            result = error
+        if isinstance(result, Exception):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
+        return None
+
+    @staticmethod
+    def _ends_batch(job) -> bool:
+        """Returns True for a truncating write job, after which no other job is batched."""
+        return job is not None and job[3]
+
+    def _submit_uring(self, jobs: list) -> list:
+        """
+        Writes a batch with a single io_uring submission.
+
+        Writes to the same descriptor are linked (IOSQE_IO_LINK) so they complete in queue order.
+
+        Args:
+            jobs (list): The write jobs of the batch.
+
+        Returns:
+            list: The bytes written (or the OSError raised) for each job.
+        """
+        # A stable sort groups the jobs per descriptor while keeping their order
+        order = sorted(range(len(jobs)), key=lambda i: jobs[i][0])
+        for position, i in enumerate(order):
+            fd, data, offset, truncate, future = jobs[i]
+            sqe = liburing.io_uring_get_sqe(self._ring)
+            liburing.io_uring_prep_write(sqe, fd, data, offset)
+            liburing.io_uring_sqe_set_data64(sqe, i)
+            if position + 1 < len(order) and jobs[order[position + 1]][0] == fd:
+                liburing.io_uring_sqe_set_flags(sqe, liburing.IOSQE_IO_LINK)
+        liburing.io_uring_submit(self._ring)
+
+        results = [None] * len(jobs)
+        for _ in jobs:
+            liburing.io_uring_wait_cqe(self._ring, self._cqe)
+            cqe = self._cqe[0]
+            i = cqe.user_data
+            try:
+                results[i] = cqe.res
+            except OSError as error:
+                results[i] = error
+            liburing.io_uring_cqe_seen(self._ring, cqe)
+        return results
+
+    @staticmethod
+    def _submit_os(jobs: list) -> list:
+        """
+        Writes a batch with one os.write/os.pwrite call per job.
+
+        Args:
+            jobs (list): The write jobs of the batch.
+
+        Returns:
+            list: The bytes written (or the OSError raised) for each job.
+        """
+        results = []
+        for fd, data, offset, truncate, future in jobs:
+            try:
+                if offset is None:
+                    results.append(os.write(fd, data))
+                else:
+                    results.append(os.pwrite(fd, data, offset))
+            except OSError as error:
+                results.append(error)
+        return results
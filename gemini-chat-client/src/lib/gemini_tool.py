@@ -6,9 +6,46 @@ sending prompts to the Gemini model, and processing responses.
 """
 
 from google import genai
-from collections import defaultdict
+from google.genai import types
+from src.lib.batch_io import IoUringBatchEngine
+from collections import OrderedDict, deque
+from concurrent.futures import Future
 from pathlib import Path
+import numpy as np
+import hashlib
+import binascii
+import base64
+import inspect
+import asyncio
 import json
+import os
+import re
+
+# orjson is optional; the fallback produces the same compact UTF-8 output
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    # json.loads accepts UTF-8 bytes just like orjson.loads
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        """Serializes obj to compact UTF-8 JSON bytes, like orjson.dumps."""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+# Inline base64 images above this decoded size are stored as blobs instead of in the history
+_BLOB_MIN_SIZE = 64 * 1024
+_BLOB_DIR = Path("chat/blobs")
+_DATA_IMAGE = re.compile(r"data:image/[\w.+-]+;base64,([A-Za-z0-9+/]+={0,2})")
+
+# Static instruction sent as the system instruction on every turn.
+# Keeping these bytes identical across calls lets the provider cache the prefix tokens.
+_SYSTEM_PREFIX = """Instruction:
+    1. Always check the 'chat history' for context only.
+    2. Return response for current prompt only.
+    3. your knowledge base is the basis for your response.
+    4. Do not repeat the chat history in your response."""
 
 
 class Client(genai.Client):
@@ -18,9 +55,20 @@ class Client(genai.Client):
     This class extends google.genai.Client to provide additional functionalities
     for managing chat sessions, history, and user interaction.
     """
+    # Static templates, filled with str.format in the chat loop
+    _WELCOME_TMPL = """
+Welcome to [{model}] Chat Client!
+    1. Check [response.csv] for [{model}]'s response.
+    2. Type 'exit' to end the chat.\n"""
+    # The static instruction is sent separately as the system instruction (_SYSTEM_PREFIX)
+    _PROMPT_TMPL = """chat history: {ctx}
+prompt: {text}"""
+
     def __init__(
         self, model: str,
-        questions=100, context_window=15, *args, **kwargs
+        questions=100, context_window=15, cache=True,
+        similarity_threshold=0.92, embedding_model="gemini-embedding-001",
+        *args, **kwargs
     ) -> None:
         """
         Initializes the Gemini Client.
@@ -29,6 +77,9 @@ class Client(genai.Client):
             model (str): The name of the Gemini model to use (e.g., "gemini-2.0-flash").
             questions (int, optional): The maximum number of questions allowed in a chat session. Defaults to 100.
             context_window (int, optional): The number of recent chat turns to include as context for the Gemini model. Defaults to 15.
+            cache (bool, optional): Whether to reuse responses for repeated or paraphrased prompts. Defaults to True.
+            similarity_threshold (float, optional): The minimum cosine similarity for a semantic cache hit. Defaults to 0.92.
+            embedding_model (str, optional): The model used to embed prompts for the semantic cache. Defaults to "gemini-embedding-001".
             *args: Variable length argument list to pass to the base genai.Client constructor.
             **kwargs: Arbitrary keyword arguments to pass to the base genai.Client constructor.
         """
@@ -36,6 +87,24 @@ class Client(genai.Client):
         self.model = model
         self.questions = questions
         self.context_window = context_window
+        self.cache = cache
+        self.similarity_threshold = similarity_threshold
+        self.embedding_model = embedding_model
+        self.history_fd = None
+        self.writer = None
+        self.response_fd = None
+        # Errors of failed queued writes, raised by `close_history`
+        self._write_errors = []
+        self._ctx = deque(maxlen=context_window)
+        self._ctx_str = ""
+        # Recently stored blob hashes, so a repeated image is not written again
+        self._blobs = OrderedDict()
+        # Exact cache: sha256 of the canonical prompt -> response
+        self._exact = {}
+        # Semantic cache: one row of normalized prompt embedding per cached response.
+        # Rows past len(self._emb_responses) are spare capacity, grown geometrically.
+        self._emb = np.empty((0, 0), dtype=np.float32)
+        self._emb_responses = []
 
     @staticmethod
     def process_response(method):
@@ -43,6 +112,9 @@ class Client(genai.Client):
         A static method decorator to process the response from the Gemini API.
 
         This decorator extracts the text content from the API response.
+        Callers may also pass `on_hit`, which is called with a cached response before
+        it is returned (e.g. to write it where a streamed response would have gone).
+        Both regular and async methods are supported.
 
         Args:
             method (callable): The method whose response needs to be processed.
@@ -50,6 +122,14 @@ class Client(genai.Client):
         Returns:
             callable: A wrapper function that processes the method's response.
         """
+        if inspect.iscoroutinefunction(method):
+            async def async_wrapper(self, *args, **kwargs):
+                response = await method(self, *args, **kwargs)
+                if response:
+                    return response.text
+                return "No response received."
+            return async_wrapper
+
         def wrapper(self, *args, **kwargs):
             response = method(self, *args, **kwargs)
             if response:
@@ -57,6 +137,171 @@ class Client(genai.Client):
             return "No response received."
         return wrapper
 
+    @staticmethod
+    def cache_response(method):
+        """
+        A static method decorator to reuse responses for repeated or paraphrased prompts.
+
+        A prompt is first looked up by the SHA-256 of its canonical form, then by
+        cosine similarity of its embedding against previously answered prompts.
+        Callers may pass `cache_key` (e.g. the user's text) to key and embed instead
+        of the full prompt, together with the chat `context` the prompt carries.
+        A prompt with a context is only reused for the same text in the same
+        context: it is keyed on both and skips the semantic tier, since a follow-up
+        such as "give an example" means something else in another conversation.
+        Only a miss calls the wrapped method, and its response is cached together
+        with the embedding, so answered prompts are never embedded again.
+        If embedding fails, the response is only cached in the exact tier.
+        Callers may also pass `on_hit`, which is called with a cached response before
+        it is returned (e.g. to write it where a streamed response would have gone).
+        Both regular and async methods are supported.
+
+        Args:
+            method (callable): The method whose responses should be cached.
+
+        Returns:
+            callable: A wrapper function that serves cached responses when available.
+        """
+        if inspect.iscoroutinefunction(method):
+            async def async_wrapper(
+                self, prompt, *args, cache_key=None, context="", on_hit=None, **kwargs
+            ):
+                if not self.cache:
+                    return await method(self, prompt, *args, **kwargs)
+
+                text = prompt if cache_key is None else cache_key
+                key = self._cache_key(text, context)
+                if key in self._exact:
+                    return self._cache_hit(self._exact[key], on_hit)
+                if context:
+                    response = await method(self, prompt, *args, **kwargs)
+                    self._cache_store(key, None, response)
+                    return response
+
+                try:
+                    embedding = await self.embed_async(text)
+                except Exception:
+                    # A failed embedding (API error, quota, unknown model) only skips the semantic tier
+                    embedding = None
+                cached = None if embedding is None else self._cache_match(embedding)
+                if cached is not None:
+                    return self._cache_hit(cached, on_hit)
+
+                response = await method(self, prompt, *args, **kwargs)
+                self._cache_store(key, embedding, response)
+                return response
+            return async_wrapper
+
+        def wrapper(self, prompt, *args, cache_key=None, context="", on_hit=None, **kwargs):
+            if not self.cache:
+                return method(self, prompt, *args, **kwargs)
+
+            text = prompt if cache_key is None else cache_key
+            key = self._cache_key(text, context)
+            if key in self._exact:
+                return self._cache_hit(self._exact[key], on_hit)
+            if context:
+                response = method(self, prompt, *args, **kwargs)
+                self._cache_store(key, None, response)
+                return response
+
+            try:
+                embedding = self.embed(text)
+            except Exception:
+                # A failed embedding (API error, quota, unknown model) only skips the semantic tier
+                embedding = None
+            cached = None if embedding is None else self._cache_match(embedding)
+            if cached is not None:
+                return self._cache_hit(cached, on_hit)
+
+            response = method(self, prompt, *args, **kwargs)
+            self._cache_store(key, embedding, response)
+            return response
+        return wrapper
+
+    @staticmethod
+    def _cache_key(text: str, context: str="") -> str:
+        """Returns the exact cache key: the SHA-256 of the whitespace-collapsed, lowercased text and of the context."""
+        digest = hashlib.sha256(" ".join(text.split()).lower().encode("utf-8"))
+        if context:
+            digest.update(b"\0" + context.encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _cache_hit(response: str, on_hit=None) -> str:
+        """Passes a cached response to the caller's `on_hit` callback, if any, and returns it."""
+        if on_hit is not None:
+            on_hit(response)
+        return response
+
+    def _cache_match(self, embedding: np.ndarray):
+        """Returns the cached response most similar to the embedding, or None below the threshold."""
+        if not self._emb_responses:
+            return None
+        # One matrix-vector product scores all cached prompts at once
+        similarities = self._emb[:len(self._emb_responses)] @ embedding
+        best = int(similarities.argmax())
+        if similarities[best] >= self.similarity_threshold:
+            return self._emb_responses[best]
+        return None
+
+    def _cache_store(self, key: str, embedding, response: str) -> None:
+        """Stores a response in the exact cache, and in the semantic cache unless the embedding is None."""
+        if response == "No response received.":
+            return None
+        self._exact[key] = response
+        if embedding is None:
+            return None
+        count = len(self._emb_responses)
+        if count == self._emb.shape[0]:
+            # Double the capacity, so inserts copy the matrix only O(log n) times
+            grown = np.empty((max(2 * count, 16), embedding.size), dtype=np.float32)
+            if count:
+                grown[:count] = self._emb
+            self._emb = grown
+        self._emb[count] = embedding
+        self._emb_responses.append(response)
+        return None
+
+    @staticmethod
+    def _normalize_embedding(result) -> np.ndarray:
+        """Returns the first embedding of an embed_content result as an L2-normalized vector."""
+        embedding = np.asarray(result.embeddings[0].values, dtype=np.float32)
+        return embedding / np.linalg.norm(embedding)
+
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Embeds a text with the embedding model for the semantic cache.
+
+        Args:
+            text (str): The text to embed.
+
+        Returns:
+            np.ndarray: The L2-normalized embedding vector.
+        """
+        result = self.models.embed_content(
+            model=self.embedding_model,
+            contents=text
+        )
+        return self._normalize_embedding(result)
+
+    async def embed_async(self, text: str) -> np.ndarray:
+        """
+        Embeds a text with the embedding model for the semantic cache, without blocking the event loop.
+
+        Args:
+            text (str): The text to embed.
+
+        Returns:
+            np.ndarray: The L2-normalized embedding vector.
+        """
+        result = await self.aio.models.embed_content(
+            model=self.embedding_model,
+            contents=text
+        )
+        return self._normalize_embedding(result)
+
+    @cache_response
     @process_response
     def respond(self, prompt: str) -> str:
         """
@@ -70,46 +315,265 @@ class Client(genai.Client):
         """
         response = self.models.generate_content(
             model=self.model,
-            contents=[prompt]
+            contents=[prompt],
+            config=types.GenerateContentConfig(system_instruction=_SYSTEM_PREFIX)
         )
         return response
 
+    @cache_response
+    @process_response
+    async def respond_async(self, prompt: str) -> str:
+        """
+        Sends a prompt to the Gemini model and returns its response, without blocking the event loop.
+
+        Args:
+            prompt (str): The user's input prompt.
+
+        Returns:
+            str: The text response from the Gemini model.
+        """
+        response = await self.aio.models.generate_content(
+            model=self.model,
+            contents=[prompt],
+            config=types.GenerateContentConfig(system_instruction=_SYSTEM_PREFIX)
+        )
+        return response
+
+    @cache_response
+    async def respond_stream_async(self, prompt: str) -> str:
+        """
+        Streams the Gemini model's response to a prompt, writing each chunk to [chat/response.csv] as it arrives.
+
+        Requires the descriptor opened by `open_response`. Chunks are written at
+        increasing offsets and the file is truncated once the stream ends, so the
+        chunk writes can share batches; an empty stream writes the placeholder instead.
+
+        Args:
+            prompt (str): The user's input prompt.
+
+        Returns:
+            str: The full text response from the Gemini model.
+        """
+        parts = []
+        offset = 0
+        stream = await self.aio.models.generate_content_stream(
+            model=self.model,
+            contents=[prompt],
+            config=types.GenerateContentConfig(system_instruction=_SYSTEM_PREFIX)
+        )
+        async for chunk in stream:
+            if not chunk.text:
+                continue
+            data = chunk.text.encode("utf-8")
+            self._write(self.response_fd, data, offset)
+            offset += len(data)
+            parts.append(chunk.text)
+        if not parts:
+            self.save_response("No response received.")
+            return "No response received."
+        # An empty truncating write drops what is left of the previous response
+        self._write(self.response_fd, b"", offset, truncate=True)
+        return "".join(parts)
+
     def load_history(self) -> dict:
         """
-        Loads the chat history from a JSON file.
+        Loads the chat history from a JSONL file.
 
-        If the history file does not exist or is empty, it initializes a new history.
-        The history is stored in a defaultdict for flexible access.
+        The history file holds one `session_metadata` record followed by one
+        `message` record per chat turn. If the JSONL file does not exist but a
+        legacy JSON history with the same name does, that file is loaded instead
+        and migrated to JSONL when the chat starts.
+        A torn final record, left by a crash in the middle of an append, is dropped.
+        Session metadata is kept in `self.meta`, with the number of turns as its
+        `history_index`. Only the context window of turns is kept in memory, plus
+        the legacy turns awaiting migration in `self._legacy_turns`.
 
         Returns:
-            dict: The loaded or initialized chat history.
+            dict: The loaded or initialized session metadata.
         """
         self.history_file.parent.mkdir(parents=True, exist_ok=True)
+        legacy_file = self.history_file.with_suffix(".json")
+        self.meta = {"title": self.chat_title, "history_index": 0}
+        self._legacy_turns = []
+        # Only the last context_window turns are rendered into the prompt context
+        self._ctx = deque(maxlen=self.context_window)
+
         if self.history_file.is_file() and self.history_file.stat().st_size > 0:
-            with self.history_file.open("r", encoding="utf-8") as f:
-                self.history = defaultdict(
-                    dict, json.load(f)
-                )
-        else:
-            self.history = defaultdict(dict)
-            self.history["title"] = self.chat_title
-            self.history["history_index"] = 0
-        
-        self.context = list(self.history.items())
-        return self.history
-    
-    def save_history(self) -> None:
+            torn = None
+            # Stream the records one line at a time, so only one record is decoded at once
+            with self.history_file.open("rb") as f:
+                offset = 0
+                for line in f:
+                    start, offset = offset, offset + len(line)
+                    if not line.strip():
+                        continue
+                    try:
+                        record = _loads(line)
+                    except ValueError:
+                        # Every record is appended with its newline in one write, so only
+                        # a final line without one can be the torn tail of a crashed append
+                        if line.endswith(b"\n"):
+                            raise
+                        torn = start
+                        break
+                    if record.get("type") == "session_metadata":
+                        self.meta["title"] = record["title"]
+                    elif record.get("type") == "message":
+                        self.meta["history_index"] += 1
+                        self._ctx.append(self._render_turn(
+                            self.meta["history_index"], record["prompt"], record["response"]
+                        ))
+            if torn is not None:
+                # Drop the fragment, so the next append starts on a line of its own
+                os.truncate(self.history_file, torn)
+        elif legacy_file.is_file() and legacy_file.stat().st_size > 0:
+            with legacy_file.open("r", encoding="utf-8") as f:
+                legacy = json.load(f)
+            self.meta["title"] = legacy.get("title", self.chat_title)
+            # Legacy turns are keyed by their index ("1", "2", ...) next to the metadata keys
+            indexes = sorted(int(key) for key in legacy if key not in ("title", "history_index"))
+            self._legacy_turns = [legacy[str(index)] for index in indexes]
+            self.meta["history_index"] = len(self._legacy_turns)
+            for index in indexes[-self.context_window:]:
+                turn = legacy[str(index)]
+                self._ctx.append(self._render_turn(index, turn["prompt"], turn["response"]))
+
+        self._ctx_str = "".join(self._ctx)
+        return self.meta
+
+    @property
+    def context(self) -> list:
+        """list: The rendered turns currently in the prompt context, oldest first."""
+        return list(self._ctx)
+
+    @staticmethod
+    def _render_turn(index: int, prompt: str, response: str) -> str:
+        """Renders a turn the way it appears in the prompt context."""
+        return f"[{index}] U:{prompt}\nA:{response}\n"
+
+    def _add_context(self, index: int, prompt: str, response: str) -> None:
         """
-        Saves the current chat history to a JSON file.
+        Renders a turn into the rolling context and refreshes the prompt context string.
+
+        Args:
+            index (int): The turn index.
+            prompt (str): The user's prompt.
+            response (str): The Gemini model's response.
         """
-        with self.history_file.open("w", encoding="utf-8") as f:
-            json.dump(self.history, f, indent=4)
+        self._ctx.append(self._render_turn(index, prompt, response))
+        self._ctx_str = "".join(self._ctx)
         return None
-    
+
+    def save_history(self, record: dict) -> Future:
+        """
+        Queues a single record to be appended to the JSONL history file.
+
+        Args:
+            record (dict): The record to append (session metadata or a chat turn).
+
+        Returns:
+            Future: Resolves once the record has been written.
+        """
+        return self._write(self.history_fd, _dumps(record) + b"\n")
+
+    def _write(self, fd: int, data: bytes, offset: int=None, truncate: bool=False) -> Future:
+        """Queues a write to the batch writer, recording its error (if any) for `close_history`."""
+        future = self.writer.write(fd, data, offset, truncate=truncate)
+        future.add_done_callback(self._record_write_error)
+        return future
+
+    def _record_write_error(self, future: Future) -> None:
+        """Keeps the error of a failed queued write; runs on the writer thread."""
+        if future.exception() is not None:
+            self._write_errors.append(future.exception())
+        return None
+
+    def open_history(self) -> None:
+        """
+        Opens the JSONL history file for appending and keeps the descriptor on the client.
+
+        The file is opened with O_APPEND, so each record is a single unbuffered write at the end of the file.
+        Writes are batched by an `IoUringBatchEngine` started here (io_uring on Linux, os.write elsewhere).
+        A new (or migrated) history file gets its session metadata and any legacy turns written once.
+        """
+        self.writer = IoUringBatchEngine()
+        self.history_fd = os.open(
+            self.history_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644
+        )
+        if os.fstat(self.history_fd).st_size == 0:
+            self.save_history({"type": "session_metadata", "title": self.meta["title"]})
+            for index, turn in enumerate(self._legacy_turns, 1):
+                self.save_history({"type": "message", "index": index, **turn})
+        self._legacy_turns = []
+        return None
+
+    def close_history(self) -> None:
+        """
+        Flushes pending writes and closes the history file descriptor opened by `open_history`.
+
+        Raises:
+            OSError: The first error of a queued history or response write that failed.
+        """
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        if self.history_fd is not None:
+            os.close(self.history_fd)
+            self.history_fd = None
+        if self._write_errors:
+            error = self._write_errors[0]
+            self._write_errors = []
+            raise error
+        return None
+
+    def _maybe_externalize(self, prompt: str, lru_size: int=128) -> str:
+        """
+        Moves large inline base64 images out of a prompt into blob files.
+
+        Each `data:image/*;base64,...` payload over 64 KiB is decoded once, written to
+        [chat/blobs/<sha256[:16]>.bin] and replaced with `[image blob:<hash>]`.
+        A payload that is not valid base64 is left inline.
+
+        Args:
+            prompt (str): The user's prompt.
+            lru_size (int, optional): The number of recent blob hashes remembered to skip rewrites. Defaults to 128.
+
+        Returns:
+            str: The prompt with large images replaced by blob references.
+        """
+        if "data:image/" not in prompt:
+            return prompt
+
+        def externalize(match):
+            payload = match.group(1)
+            # Four base64 characters encode three bytes
+            if len(payload) * 3 // 4 <= _BLOB_MIN_SIZE:
+                return match.group(0)
+            try:
+                data = base64.b64decode(payload)
+            except binascii.Error:
+                # Malformed padding or length; keep the text as the user typed it
+                return match.group(0)
+            digest = hashlib.sha256(data).hexdigest()[:16]
+            if digest in self._blobs:
+                self._blobs.move_to_end(digest)
+            else:
+                blob_file = _BLOB_DIR / f"{digest}.bin"
+                if not blob_file.is_file():
+                    _BLOB_DIR.mkdir(parents=True, exist_ok=True)
+                    blob_file.write_bytes(data)
+                self._blobs[digest] = None
+                if len(self._blobs) > lru_size:
+                    self._blobs.popitem(last=False)
+            return f"[image blob:{digest}]"
+
+        return _DATA_IMAGE.sub(externalize, prompt)
+
     def update_history(self, prompt="", response="") -> str:
         """
         Updates the chat history with a new prompt and response.
 
+        Large inline images in the prompt are stored as blobs (see `_maybe_externalize`).
         Also checks if the maximum number of questions for the session has been reached.
 
         Args:
@@ -122,71 +586,140 @@ class Client(genai.Client):
         if self.questions < 1:
             self.questions = 1
     
-        self.history["history_index"] += 1
-        self.history.update({
-            self.history["history_index"]: {
-                "prompt": prompt,
-                "response": response
-            }
+        prompt = self._maybe_externalize(prompt)
+        self.meta["history_index"] += 1
+        self._add_context(self.meta["history_index"], prompt, response)
+        # Append the new turn to the history file
+        self.save_history({
+            "type": "message",
+            "index": self.meta["history_index"],
+            "prompt": prompt,
+            "response": response
         })
-        self.context.append(
-            (self.history["history_index"], {
-                "prompt": prompt,
-                "response": response
-            })
-        )    
-        # Save chat history to file
-        self.save_history()
         
-        # Check if the number of questions has reached the limit
-        # (len(self.history) - 2) accounts for 'title' and 'history_index' keys
-        if (len(self.history) - 2) == (self.questions + self.history_index):
+        # Check if the number of questions asked this session has reached the limit
+        if self.meta["history_index"] >= self.questions + self.history_index:
             print(f"No more questions allowed. Exiting chat. | Max -> [{self.questions}]")
             return "exit"
         return "continue"
     
-    def start_chat(self) -> str:
+    def save_response(self, response: str) -> Future:
         """
-        Starts an interactive chat session with the Gemini model.
+        Queues the latest response to overwrite [chat/response.csv].
+
+        The response is written at offset 0 of the descriptor opened by `open_response`,
+        then the file is truncated to its length, so no open/close happens per turn.
+
+        Args:
+            response (str): The Gemini model's response.
+
+        Returns:
+            Future: Resolves once the response has been written.
+        """
+        return self._write(self.response_fd, response.encode("utf-8"), 0, truncate=True)
+
+    def open_response(self) -> None:
+        """
+        Opens [chat/response.csv] once for the chat session and keeps the descriptor on the client.
+        """
+        self.response_fd = os.open("chat/response.csv", os.O_WRONLY | os.O_CREAT, 0o644)
+        return None
+
+    def close_response(self) -> None:
+        """
+        Closes the response file descriptor opened by `open_response`.
+
+        Call it after `close_history`, which flushes the pending writes.
+        """
+        if self.response_fd is not None:
+            os.close(self.response_fd)
+            self.response_fd = None
+        return None
+
+    async def start_chat_async(self) -> str:
+        """
+        Starts an interactive chat session with the Gemini model on the running event loop.
 
         This method handles the main chat loop, taking user input,
         sending it to the Gemini model, displaying responses, and managing history.
+        Stdin is read on the main thread, so Ctrl+C interrupts input() right away
+        (a worker thread stuck in input() would keep the event loop from shutting down).
+        Nothing else waits on the event loop meanwhile: the history append and the
+        response write are queued to the batch writer, whose thread submits them
+        while the next prompt is read.
 
         Returns:
             str: The name of the model used for the chat.
         """
         # Welcome message
-        welcome_message = f"""
-Welcome to [{self.model}] Chat Client!
-    1. Check [response.csv] for [{self.model}]'s response.
-    2. Type 'exit' to end the chat.\n"""
-        print(welcome_message)
+        print(self._WELCOME_TMPL.format(model=self.model))
     
         # Enter chat title
         self.chat_title = input("Enter chat title: ")
-        self.history_file = Path(f"chat/history/{self.chat_title}.json")
-        self.history = self.load_history()
-        self.history_index = self.history.get("history_index", 0)
-    
+        self.history_file = Path(f"chat/history/{self.chat_title}.jsonl")
+        self.load_history()
+        self.history_index = self.meta["history_index"]
+        self.open_history()
+        self.open_response()
+        try:
+            return await self._chat_loop()
+        finally:
+            # Flush queued writes and release the descriptors on exit, errors and Ctrl+C alike
+            try:
+                self.close_history()
+            finally:
+                self.close_response()
+
+    async def _chat_loop(self) -> str:
+        """
+        Runs the prompt/response loop of `start_chat_async` until the chat exits.
+
+        Returns:
+            str: The name of the model used for the chat.
+        """
         while True:
             text = input("\nEnter your prompt: ")
-            prompt = f"""chat history: {self.context[-self.context_window:]}
-Instruction: 
-    1. Always check the 'chat history' for context only.
-    2. Return response for current prompt only.
-    3. your knowledge base is the basis for your response.  
-    4. Do not repeat the chat history in your response.
-    prompt: {text}"""
-            response = self.respond(prompt)
-            status = self.update_history(prompt, response)
-    
-            file = Path(f"chat/response.csv")
-            with file.open("w", encoding="utf-8") as f:
-                f.write(response)
-                f.seek(0, 2)
+            status = "exit" if text.strip().lower() == "exit" else "continue"
+
+            if status == "continue":
+                prompt = self._PROMPT_TMPL.format(ctx=self._ctx_str, text=text)
+                # The cache is keyed on the user's text and the chat context, not on the whole prompt.
+                # A cached response is not streamed, so it is written to the file on the hit.
+                response = await self.respond_stream_async(
+                    prompt, cache_key=text, context=self._ctx_str, on_hit=self.save_response
+                )
+                # Store the user's text only, so each turn does not carry the previous context
+                status = self.update_history(text, response)
             
-            if status == "exit" or prompt.lower() == "exit":
+            if status == "exit":
                 print("Exiting chat...")
                 print(f"Chat history saved to [{self.history_file.name}]")
                 exit()
-        return self.model
\ No newline at end of file
+        return self.model
+
+    def start_chat(self) -> str:
+        """
+        Starts an interactive chat session with the Gemini model.
+
+        This is a thin wrapper running `start_chat_async` in a new event loop.
+        Unlike asyncio.run, it does not install a SIGINT handler: that handler only
+        cancels the main task, which cannot interrupt a blocking input(), whereas the
+        default handler raises KeyboardInterrupt in it right away.
+
+        Returns:
+            str: The name of the model used for the chat.
+        """
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            return loop.run_until_complete(self.start_chat_async())
+        finally:
+            # Cancel leftover tasks, as asyncio.run does
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            asyncio.set_event_loop(None)
+            loop.close()
@@ -5,20 +5,36 @@ with different severity levels (info, error, critical) and includes
 detailed error information when exceptions occur.
 """
 
+from logging.handlers import MemoryHandler
 from pathlib import Path
 import logging
 import traceback
+import atexit
 import sys
+import os
 
-# Ensure the log directory exists
-Path("log").mkdir(parents=True, exist_ok=True)
+# One row per record, in the order of the default header row (DATE,LEVEL,MESSAGE,ERROR,FILE,LINE).
+# The error fields come from `extra` and stay empty for info records.
+_FMT = logging.Formatter(
+    '%(asctime)s,%(levelname)s,%(message)s,%(error)s,%(error_file)s,%(error_line)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    defaults={"error": "", "error_file": "", "error_line": ""}
+)
+
+# Characters that would break a CSV row: commas become dots, line breaks become spaces
+_CSV_ESC = str.maketrans({",": ".", "\n": " ", "\r": " "})
 
 class Log:
     """A custom logging class that writes log messages to a CSV file.
 
     Logs include timestamp, level, message, error details (if applicable),
     file name, and line number.
+
+    Records are buffered in a `MemoryHandler` shared by all instances and written
+    to the file in batches; critical records flush the buffer immediately.
     """
+    _handler = None
+    _file_handler = None
     def __init__(
         self, file_name: str='log.csv',
         header_row: str='DATE,LEVEL,MESSAGE,ERROR,FILE,LINE'
@@ -31,50 +47,97 @@ class Log:
             header_row (str, optional): The header row for the CSV file. Defaults to 'DATE,LEVEL,MESSAGE,ERROR,FILE,LINE'.
         """
         self.log_file = Path(f"log/{file_name}")
-        logging.basicConfig(
-            filename=self.log_file,
-            filemode='a',
-            level=logging.INFO,
-            format='%(asctime)s,%(levelname)s,%(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S',
-            encoding='utf-8'
-        )
+        # Ensure the log directory exists
+        os.makedirs(self.log_file.parent, exist_ok=True)
+        self._install_handler()
         self.fields = header_row.split(',')
         # Write header if the file is new or empty
-        if not self.log_file.is_file() or self.log_file.stat().st_size == 0:
+        try:
+            new_file = os.stat(self.log_file).st_size == 0
+        except FileNotFoundError:
+            new_file = True
+        if new_file:
             with self.log_file.open('w') as f:
                 f.write(f"{header_row}\n")
                 f.seek(0, 2)
     
-    def _get_error_details(self):
+    def _install_handler(self, capacity: int=256) -> None:
+        """
+        Attaches the buffered file handler for this log file to the root logger.
+
+        The handler is reused while it still writes to the same file; otherwise
+        (another file, or closed by `logging.shutdown`) it is replaced.
+
+        Args:
+            capacity (int, optional): The number of records buffered before a write. Defaults to 256.
+        """
+        handler = Log._handler
+        if (
+            handler is not None and handler.target is not None
+            and handler.target.baseFilename == os.path.abspath(self.log_file)
+        ):
+            return None
+
+        if handler is not None:
+            logging.root.removeHandler(handler)
+            handler.close()
+            # MemoryHandler.close() flushes but leaves its target open
+            Log._file_handler.close()
+        file_handler = logging.FileHandler(self.log_file, mode='a', encoding='utf-8')
+        file_handler.setFormatter(_FMT)
+        handler = MemoryHandler(
+            capacity=capacity, flushLevel=logging.CRITICAL, target=file_handler
+        )
+        logging.root.addHandler(handler)
+        logging.root.setLevel(logging.INFO)
+        atexit.register(handler.flush)
+        Log._handler = handler
+        # Keep the file handler referenced, as MemoryHandler.close() drops its target
+        Log._file_handler = file_handler
+        return None
+
+    def flush(self) -> None:
+        """Writes all buffered records to the log file."""
+        if Log._handler is not None:
+            Log._handler.flush()
+        return None
+
+    def _get_error_details(self, exc: BaseException=None):
         """
-        Extracts detailed information about the current exception.
+        Extracts detailed information about an exception, by default the one being handled.
 
         This method captures the error type, message, and the file/line number
         where the error occurred, prioritizing the location within this log module
         if applicable, otherwise falling back to the last frame.
+        Without an exception, placeholder details are returned.
+
+        Args:
+            exc (BaseException, optional): The exception to describe. Defaults to None (the exception being handled).
 
         Returns:
-            dict: A dictionary containing error details (error, message, file, line).
+            tuple: The exception message and the `extra` fields of the record (error, error_file, error_line).
         """
-        error_type, message, tracebk = sys.exc_info()
-        error_name = error_type.__name__
+        if exc is None:
+            exc = sys.exc_info()[1]
+        if exc is None:
+            return "No active exception.", {"error": "None"}
+        error_type, message, tracebk = type(exc), exc, exc.__traceback__
 
-        frames = traceback.extract_tb(tracebk)
-        # Attempt to find the frame within this file, otherwise use the last frame
-        frame = next(
-            (frame for frame in reversed(frames) if frame.filename == __file__), frames[-1]
-        )
-        file_name = Path(frame.filename).name
-        line_no = frame.lineno
-
-        error_details = {
-            "error": error_name,
-            "message": str(message).replace(',', '.'), # Replace commas to avoid CSV formatting issues
-            "file": file_name,
-            "line": line_no
+        # Walk the raw frames instead of extract_tb, which looks up every source line
+        last_frame = own_frame = None
+        for frame, lineno in traceback.walk_tb(tracebk):
+            last_frame = (frame.f_code.co_filename, lineno)
+            if frame.f_code.co_filename == __file__:
+                own_frame = last_frame
+        # Use the last frame within this file if there is one, otherwise the last frame
+        file_name, line_no = own_frame or last_frame
+
+        # Escape commas and line breaks to avoid CSV formatting issues
+        return str(message).translate(_CSV_ESC), {
+            "error": error_type.__name__,
+            "error_file": Path(file_name).name,
+            "error_line": line_no
         }
-        return error_details
 
     def info(self, message: str) -> None:
         """Logs an informational message.
@@ -83,44 +146,34 @@ class Log:
             message (str): The message to log.
         """
         if message:
-            message = message.replace(',', '.') # Replace commas to avoid CSV formatting issues
+            message = message.translate(_CSV_ESC) # Escape commas and line breaks to avoid CSV formatting issues
             logging.info(message)
         else:
             logging.info('No message provided.')
         return None
     
-    def error(self, message: str=None) -> None:
+    def error(self, message: str=None, exc: BaseException=None) -> None:
         """Logs an error message with detailed exception information.
 
         Args:
             message (str, optional): An optional custom message to include with the error. Defaults to None.
+            exc (BaseException, optional): The exception to log. Defaults to None (the exception being handled).
         """
-        error_details = self._get_error_details()
+        error_message, extra = self._get_error_details(exc)
         if message:
-            error_details["message"] = message.replace(',', '.')
-        logging.error(
-            "%s,%s,%s,%s", 
-            error_details['error'],
-            error_details['message'],
-            error_details['file'], 
-            error_details['line']
-        )
+            error_message = message.translate(_CSV_ESC)
+        logging.error(error_message, extra=extra)
         return None
     
-    def critical(self, message: str=None) -> None:
+    def critical(self, message: str=None, exc: BaseException=None) -> None:
         """Logs a critical error message with detailed exception information.
 
         Args:
             message (str, optional): An optional custom message to include with the critical error. Defaults to None.
+            exc (BaseException, optional): The exception to log. Defaults to None (the exception being handled).
         """
-        error_details = self._get_error_details()
+        error_message, extra = self._get_error_details(exc)
         if message:
-            error_details["message"] = message.replace(',', '.')
-        logging.critical(
-            "%s,%s,%s,%s", 
-            error_details['error'],
-            error_details['message'],
-            error_details['file'], 
-            error_details['line']
-        )
+            error_message = message.translate(_CSV_ESC)
+        logging.critical(error_message, extra=extra)
         return None
\ No newline at end of file
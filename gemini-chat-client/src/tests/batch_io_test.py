@@ -0,0 +1,91 @@
+"""Unit tests for the IoUringBatchEngine class using unittest framework.
+
+This script contains test cases to verify that batched writes keep their
+order and offsets, both through io_uring and through the os.write fallback.
+"""
+
+import unittest
+import tempfile
+import os
+from unittest.mock import patch
+from pathlib import Path
+from src.lib import batch_io
+from src.lib.batch_io import IoUringBatchEngine
+
+class TestIoUringBatchEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file = Path(self.tmp_dir.name) / "batch.txt"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _check_writes(self, engine):
+        fd = os.open(self.file, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        futures = [engine.write(fd, f"line {i}\n".encode("utf-8")) for i in range(20)]
+        engine.close()
+        os.close(fd)
+        self.assertEqual(futures[0].result(), len(b"line 0\n"))
+        self.assertEqual(
+            self.file.read_text(encoding="utf-8"),
+            "".join(f"line {i}\n" for i in range(20))
+        )
+
+    def test_writes_keep_order(self):
+        self._check_writes(IoUringBatchEngine())
+
+    def test_writes_keep_order_without_liburing(self):
+        with patch.object(batch_io, "liburing", None):
+            engine = IoUringBatchEngine()
+        self.assertEqual(engine.backend, "os")
+        self._check_writes(engine)
+
+    def test_write_at_offset(self):
+        engine = IoUringBatchEngine()
+        fd = os.open(self.file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        engine.write(fd, b"response", 0)
+        engine.write(fd, b"R", 0)
+        engine.close()
+        os.close(fd)
+        self.assertEqual(self.file.read_bytes(), b"Response")
+
+    def test_write_with_truncate_replaces_content(self):
+        engine = IoUringBatchEngine()
+        fd = os.open(self.file, os.O_WRONLY | os.O_CREAT, 0o644)
+        engine.write(fd, b"a much longer first response", 0, truncate=True)
+        engine.write(fd, b"short", 0, truncate=True)
+        engine.close()
+        os.close(fd)
+        self.assertEqual(self.file.read_bytes(), b"short")
+
+    def test_consecutive_truncating_writes_append(self):
+        engine = IoUringBatchEngine()
+        fd = os.open(self.file, os.O_WRONLY | os.O_CREAT, 0o644)
+        offset = 0
+        for chunk in (b"hello", b" streamed", b" response"):
+            engine.write(fd, chunk, offset, truncate=True)
+            offset += len(chunk)
+        engine.close()
+        os.close(fd)
+        self.assertEqual(self.file.read_bytes(), b"hello streamed response")
+
+    def test_failed_write_sets_exception(self):
+        engine = IoUringBatchEngine()
+        self.file.write_text("read only", encoding="utf-8")
+        fd = os.open(self.file, os.O_RDONLY)
+        future = engine.write(fd, b"data")
+        engine.close()
+        os.close(fd)
+        self.assertIsInstance(future.exception(), OSError)
+
+    def test_failed_truncate_keeps_worker_running(self):
+        engine = IoUringBatchEngine()
+        fd = os.open(os.devnull, os.O_WRONLY)
+        # /dev/null accepts the write but cannot be truncated
+        future = engine.write(fd, b"data", 0, truncate=True)
+        engine.flush()
+        self.assertIsInstance(future.exception(), OSError)
+        second = engine.write(fd, b"more")
+        engine.close()
+        os.close(fd)
+        self.assertEqual(second.result(), len(b"more"))
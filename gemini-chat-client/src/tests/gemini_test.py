@@ -42,14 +42,16 @@ class TestGeminiMain(unittest.TestCase):
         """
         Test that main() logs a critical error if an unexpected exception occurs during chat startup.
         - Simulates an exception from gemini.start_chat().
-        - Verifies that log.critical() is called to record the error.
+        - Verifies that log.critical() is called with the exception to record the error.
         """
         from src.gemini import main
         log = MagicMock()
         gemini = MagicMock()
-        gemini.start_chat.side_effect = Exception('Unexpected error')
+        error = Exception('Unexpected error')
+        gemini.start_chat.side_effect = error
         main(log=log, gemini=gemini)
         self.assertTrue(log.critical.called, "Expected log.critical to be called on exception.")
+        log.critical.assert_called_with(exc=error)
 
     def test_main_system_exit(self):
         """
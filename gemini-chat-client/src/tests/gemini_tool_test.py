@@ -0,0 +1,421 @@
+"""Unit tests for the Client class in gemini_tool.py using unittest framework.
+
+This script contains test cases to verify chat history handling, response
+caching and the chat loop of the Client class without sending any request
+to the Gemini API.
+"""
+
+import unittest
+import tempfile
+import asyncio
+import hashlib
+import base64
+import json
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+from pathlib import Path
+import numpy as np
+from src.lib.batch_io import IoUringBatchEngine
+from src.lib.gemini_tool import Client, _SYSTEM_PREFIX
+
+class TestClientHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.client = Client("gemini-2.0-flash", api_key="test-key")
+        self.client.chat_title = "test_chat"
+        self.client.history_file = Path(self.tmp_dir.name) / "test_chat.jsonl"
+
+    def tearDown(self):
+        self.client.close_history()
+        self.tmp_dir.cleanup()
+
+    def _start_session(self):
+        self.client.load_history()
+        self.client.history_index = self.client.meta["history_index"]
+        self.client.open_history()
+
+    def test_history_appends_jsonl_records(self):
+        self._start_session()
+        self.client.update_history("first prompt", "first response")
+        self.client.update_history("second prompt", "second response")
+        self.client.close_history()
+
+        with self.client.history_file.open("r", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records[0], {"type": "session_metadata", "title": "test_chat"})
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[2]["index"], 2)
+        self.assertEqual(records[2]["prompt"], "second prompt")
+
+    def test_failed_history_write_is_raised_on_close(self):
+        self._start_session()
+        os.close(self.client.history_fd)
+        self.client.history_fd = os.open(self.client.history_file, os.O_RDONLY)
+        self.client.update_history("first prompt", "first response")
+        with self.assertRaises(OSError):
+            self.client.close_history()
+        self.assertIsNone(self.client.history_fd)
+
+    def test_context_keeps_last_turns(self):
+        self.client.context_window = 2
+        self._start_session()
+        for i in range(1, 4):
+            self.client.update_history(f"prompt {i}", f"response {i}")
+        self.assertEqual(
+            self.client._ctx_str,
+            "[2] U:prompt 2\nA:response 2\n[3] U:prompt 3\nA:response 3\n"
+        )
+        self.client.close_history()
+
+        self.client.load_history()
+        self.assertEqual(
+            self.client._ctx_str,
+            "[2] U:prompt 2\nA:response 2\n[3] U:prompt 3\nA:response 3\n"
+        )
+        self.assertEqual(
+            self.client.context,
+            ["[2] U:prompt 2\nA:response 2\n", "[3] U:prompt 3\nA:response 3\n"]
+        )
+
+    def test_question_limit_counts_current_session(self):
+        self.client.questions = 2
+        self._start_session()
+        self.assertEqual(self.client.update_history("first prompt", "first response"), "continue")
+        with patch("builtins.print"):
+            self.assertEqual(self.client.update_history("second prompt", "second response"), "exit")
+        self.client.close_history()
+
+        self._start_session()
+        self.assertEqual(self.client.update_history("third prompt", "third response"), "continue")
+
+    def test_history_reloads_from_jsonl(self):
+        self._start_session()
+        self.client.update_history("first prompt", "first response")
+        self.client.close_history()
+
+        meta = self.client.load_history()
+        self.assertEqual(meta, {"title": "test_chat", "history_index": 1})
+        self.assertEqual(self.client.context, ["[1] U:first prompt\nA:first response\n"])
+
+    def test_torn_last_record_and_untyped_records_are_skipped(self):
+        self._start_session()
+        self.client.update_history("first prompt", "first response")
+        self.client.close_history()
+        with self.client.history_file.open("ab") as f:
+            f.write(b'{"note":"untyped"}\n{"type":"message","index":2,"prom')
+
+        self._start_session()
+        self.assertEqual(self.client.meta["history_index"], 1)
+        self.client.update_history("second prompt", "second response")
+        self.client.close_history()
+
+        with self.client.history_file.open("r", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records[-1]["prompt"], "second prompt")
+        self.assertEqual(len(records), 4)
+
+    def test_legacy_json_history_is_migrated(self):
+        legacy_file = self.client.history_file.with_suffix(".json")
+        with legacy_file.open("w", encoding="utf-8") as f:
+            json.dump({
+                "title": "test_chat",
+                "history_index": 1,
+                "1": {"prompt": "old prompt", "response": "old response"}
+            }, f)
+
+        self._start_session()
+        self.assertEqual(self.client.context, ["[1] U:old prompt\nA:old response\n"])
+        self.client.update_history("new prompt", "new response")
+        self.client.close_history()
+
+        self.client.load_history()
+        self.assertEqual(self.client.meta["history_index"], 2)
+        self.assertEqual(self.client.context, [
+            "[1] U:old prompt\nA:old response\n", "[2] U:new prompt\nA:new response\n"
+        ])
+        with self.client.history_file.open("r", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([record.get("prompt") for record in records], [None, "old prompt", "new prompt"])
+
+class TestClientBlobs(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp_dir.name)
+        self.client = Client("gemini-2.0-flash", api_key="test-key")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp_dir.cleanup()
+
+    def test_large_image_is_stored_as_blob(self):
+        data = os.urandom(100 * 1024)
+        payload = base64.b64encode(data).decode("ascii")
+        prompt = f"Describe data:image/png;base64,{payload} please"
+        digest = hashlib.sha256(data).hexdigest()[:16]
+
+        self.assertEqual(
+            self.client._maybe_externalize(prompt),
+            f"Describe [image blob:{digest}] please"
+        )
+        self.assertEqual(Path(f"chat/blobs/{digest}.bin").read_bytes(), data)
+        self.assertEqual(self.client._maybe_externalize(prompt), f"Describe [image blob:{digest}] please")
+        self.assertEqual(len(list(Path("chat/blobs").iterdir())), 1)
+
+    def test_small_image_is_kept_inline(self):
+        payload = base64.b64encode(b"tiny image").decode("ascii")
+        prompt = f"Describe data:image/png;base64,{payload}"
+        self.assertEqual(self.client._maybe_externalize(prompt), prompt)
+        self.assertFalse(Path("chat/blobs").exists())
+
+    def test_invalid_base64_is_kept_inline(self):
+        prompt = "Describe data:image/png;base64," + "A" * 90001
+        self.assertEqual(self.client._maybe_externalize(prompt), prompt)
+        self.assertFalse(Path("chat/blobs").exists())
+
+class TestClientRespond(unittest.TestCase):
+    def setUp(self):
+        self.client = Client("gemini-2.0-flash", api_key="test-key")
+        self.client._models = MagicMock()
+        self.client.models.generate_content.return_value = MagicMock(text="cached answer")
+
+    def _embed_as(self, *vectors):
+        self.client.models.embed_content.side_effect = [
+            MagicMock(embeddings=[MagicMock(values=vector)]) for vector in vectors
+        ]
+
+    def test_exact_prompt_is_served_from_cache(self):
+        self._embed_as([1.0, 0.0])
+        self.assertEqual(self.client.respond("What is Python?"), "cached answer")
+        self.assertEqual(self.client.respond("  what is   python? "), "cached answer")
+        self.client.models.generate_content.assert_called_once()
+        self.client.models.embed_content.assert_called_once()
+
+    def test_similar_prompt_is_served_from_cache(self):
+        self._embed_as([1.0, 0.0], [0.99, 0.05])
+        self.client.respond("What is Python?")
+        self.assertEqual(self.client.respond("Tell me what Python is"), "cached answer")
+        self.client.models.generate_content.assert_called_once()
+
+    def test_dissimilar_prompt_calls_model(self):
+        self._embed_as([1.0, 0.0], [0.0, 1.0])
+        self.client.respond("What is Python?")
+        self.client.respond("How tall is Everest?")
+        self.assertEqual(self.client.models.generate_content.call_count, 2)
+
+    def test_semantic_cache_grows_past_initial_capacity(self):
+        vectors = np.eye(20, dtype=np.float32)
+        self._embed_as(*vectors.tolist(), vectors[17].tolist())
+        for i in range(20):
+            self.client.models.generate_content.return_value = MagicMock(text=f"answer {i}")
+            self.client.respond(f"question {i}")
+        self.assertEqual(self.client.respond("paraphrased question 17"), "answer 17")
+        self.assertEqual(self.client.models.generate_content.call_count, 20)
+
+    def test_cache_key_replaces_prompt(self):
+        self._embed_as([1.0, 0.0])
+        self.client.respond("chat history: first\nprompt: What is Python?", cache_key="What is Python?")
+        self.assertEqual(
+            self.client.respond("chat history: second\nprompt: What is Python?", cache_key="What is Python?"),
+            "cached answer"
+        )
+        self.client.models.generate_content.assert_called_once()
+        self.assertEqual(self.client.models.embed_content.call_args.kwargs["contents"], "What is Python?")
+
+    def test_follow_up_is_only_cached_in_its_context(self):
+        for context in ("[1] U:explain python\n", "[1] U:explain rust\n", "[1] U:explain rust\n"):
+            self.client.respond(f"chat history: {context}\nprompt: give an example",
+                                cache_key="give an example", context=context)
+        self.assertEqual(self.client.models.generate_content.call_count, 2)
+        self.client.models.embed_content.assert_not_called()
+
+    def test_failed_embedding_is_a_cache_miss(self):
+        self.client.models.embed_content.side_effect = RuntimeError("embedding model not found")
+        self.assertEqual(self.client.respond("What is Python?"), "cached answer")
+        self.assertEqual(self.client.respond("Tell me what Python is"), "cached answer")
+        self.assertEqual(self.client.models.generate_content.call_count, 2)
+
+    def test_failed_embedding_still_fills_exact_cache(self):
+        self.client.models.embed_content.side_effect = RuntimeError("embedding model not found")
+        self.client.respond("What is Python?")
+        self.assertEqual(self.client.respond("what is python?"), "cached answer")
+        self.client.models.generate_content.assert_called_once()
+        self.client.models.embed_content.assert_called_once()
+
+    def test_default_embedding_model(self):
+        self._embed_as([1.0, 0.0])
+        self.client.respond("What is Python?")
+        self.assertEqual(self.client.models.embed_content.call_args.kwargs["model"], "gemini-embedding-001")
+
+    def test_failed_async_embedding_is_a_cache_miss(self):
+        self.client._aio = MagicMock()
+        self.client.aio.models.generate_content = AsyncMock(return_value=MagicMock(text="async answer"))
+        self.client.aio.models.embed_content = AsyncMock(side_effect=RuntimeError("quota exceeded"))
+        self.assertEqual(asyncio.run(self.client.respond_async("What is Python?")), "async answer")
+        self.client.aio.models.generate_content.assert_awaited_once()
+
+    def test_cache_hit_is_passed_to_on_hit(self):
+        self._embed_as([1.0, 0.0])
+        on_hit = MagicMock()
+        self.client.respond("What is Python?", on_hit=on_hit)
+        on_hit.assert_not_called()
+        self.client.respond("what is python?", on_hit=on_hit)
+        on_hit.assert_called_once_with("cached answer")
+
+    def test_cache_can_be_disabled(self):
+        self.client.cache = False
+        self.client.respond("What is Python?")
+        self.client.respond("What is Python?")
+        self.assertEqual(self.client.models.generate_content.call_count, 2)
+        self.client.models.embed_content.assert_not_called()
+
+    def test_system_instruction_is_sent_with_prompt(self):
+        self.client.cache = False
+        self.client.respond("What is Python?")
+        kwargs = self.client.models.generate_content.call_args.kwargs
+        self.assertEqual(kwargs["config"].system_instruction, _SYSTEM_PREFIX)
+        self.assertEqual(kwargs["contents"], ["What is Python?"])
+
+    def test_async_respond_uses_cache(self):
+        self.client._aio = MagicMock()
+        self.client.aio.models.generate_content = AsyncMock(return_value=MagicMock(text="async answer"))
+        self.client.aio.models.embed_content = AsyncMock(
+            return_value=MagicMock(embeddings=[MagicMock(values=[1.0, 0.0])])
+        )
+        self.assertEqual(asyncio.run(self.client.respond_async("What is Python?")), "async answer")
+        self.assertEqual(asyncio.run(self.client.respond_async("what is python?")), "async answer")
+        self.client.aio.models.generate_content.assert_awaited_once()
+
+class TestClientChat(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp_dir.name)
+        self.client = Client("gemini-2.0-flash", cache=False, api_key="test-key")
+        self.client._aio = MagicMock()
+
+        async def stream():
+            for text in ("hello", None, " back"):
+                yield MagicMock(text=text)
+
+        self.client.aio.models.generate_content_stream = AsyncMock(side_effect=lambda **kwargs: stream())
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp_dir.cleanup()
+
+    def test_chat_saves_response_and_exits(self):
+        Path("chat").mkdir()
+        Path("chat/response.csv").write_text("a previous, much longer response", encoding="utf-8")
+        with patch("builtins.input", side_effect=["test_chat", "hello", "exit"]), \
+                patch("builtins.print"):
+            with self.assertRaises(SystemExit):
+                self.client.start_chat()
+
+        self.client.aio.models.generate_content_stream.assert_awaited_once()
+        self.assertEqual(
+            self.client.aio.models.generate_content_stream.call_args.kwargs["contents"],
+            ["chat history: \nprompt: hello"]
+        )
+        self.assertEqual(Path("chat/response.csv").read_text(encoding="utf-8"), "hello back")
+        self.assertEqual(self.client.load_history()["history_index"], 1)
+        self.assertEqual(self.client.context, ["[1] U:hello\nA:hello back\n"])
+
+    def test_streamed_response_is_written_once(self):
+        with patch("builtins.input", side_effect=["test_chat", "hello", "exit"]), \
+                patch("builtins.print"), \
+                patch.object(Client, "save_response") as save_response:
+            with self.assertRaises(SystemExit):
+                self.client.start_chat()
+        save_response.assert_not_called()
+
+    def test_cached_response_is_written_to_file(self):
+        self.client.cache = True
+        # Without chat context, repeated prompts are served from the cache
+        self.client.context_window = 0
+        self.client.aio.models.embed_content = AsyncMock(side_effect=[
+            MagicMock(embeddings=[MagicMock(values=vector)]) for vector in ([1.0, 0.0], [0.0, 1.0])
+        ])
+
+        async def stream(contents, **kwargs):
+            yield MagicMock(text=contents[0].rsplit(" ", 1)[-1])
+
+        self.client.aio.models.generate_content_stream.side_effect = lambda **kwargs: stream(**kwargs)
+        with patch("builtins.input", side_effect=["test_chat", "hello back", "bye", "HELLO  back", "exit"]), \
+                patch("builtins.print"):
+            with self.assertRaises(SystemExit):
+                self.client.start_chat()
+
+        self.assertEqual(self.client.aio.models.generate_content_stream.await_count, 2)
+        self.assertEqual(Path("chat/response.csv").read_text(encoding="utf-8"), "back")
+
+    def test_chat_embeds_user_text(self):
+        self.client.cache = True
+        self.client.aio.models.embed_content = AsyncMock(
+            return_value=MagicMock(embeddings=[MagicMock(values=[1.0, 0.0])])
+        )
+        with patch("builtins.input", side_effect=["test_chat", "hello", "exit"]), \
+                patch("builtins.print"):
+            with self.assertRaises(SystemExit):
+                self.client.start_chat()
+
+        self.client.aio.models.embed_content.assert_awaited_once()
+        self.assertEqual(self.client.aio.models.embed_content.call_args.kwargs["contents"], "hello")
+
+    def test_follow_ups_in_different_contexts_call_model(self):
+        self.client.cache = True
+        self.client.aio.models.embed_content = AsyncMock(side_effect=[
+            MagicMock(embeddings=[MagicMock(values=vector)]) for vector in ([1.0, 0.0], [0.0, 1.0])
+        ])
+
+        async def stream(contents, **kwargs):
+            # Answer with the topic of the conversation the prompt belongs to
+            yield MagicMock(text="rust" if "rust" in contents[0] else "python")
+
+        self.client.aio.models.generate_content_stream.side_effect = lambda **kwargs: stream(**kwargs)
+        inputs = ["test_chat", "explain python", "give an example", "explain rust", "give an example", "exit"]
+        with patch("builtins.input", side_effect=inputs), patch("builtins.print"):
+            with self.assertRaises(SystemExit):
+                self.client.start_chat()
+
+        self.assertEqual(self.client.aio.models.generate_content_stream.await_count, 4)
+        self.assertEqual(self.client.context[-1], "[4] U:give an example\nA:rust\n")
+
+    def test_interrupted_chat_closes_files(self):
+        with patch("builtins.input", side_effect=["test_chat", KeyboardInterrupt]), \
+                patch("builtins.print"):
+            with self.assertRaises(KeyboardInterrupt):
+                self.client.start_chat()
+
+        self.assertIsNone(self.client.history_fd)
+        self.assertIsNone(self.client.response_fd)
+        with Path("chat/history/test_chat.jsonl").open("r", encoding="utf-8") as f:
+            self.assertEqual(json.loads(f.readline())["type"], "session_metadata")
+
+    def test_streamed_chunks_are_written_as_they_arrive(self):
+        Path("chat").mkdir()
+        Path("chat/response.csv").write_text("a previous, much longer response", encoding="utf-8")
+        self.client.writer = IoUringBatchEngine()
+        self.client.open_response()
+        with patch("os.ftruncate", wraps=os.ftruncate) as ftruncate:
+            response = asyncio.run(self.client.respond_stream_async("hello"))
+            self.client.writer.close()
+        self.client.close_response()
+        self.assertEqual(response, "hello back")
+        self.assertEqual(Path("chat/response.csv").read_text(encoding="utf-8"), "hello back")
+        ftruncate.assert_called_once()
+
+    def test_empty_stream_writes_placeholder(self):
+        async def stream():
+            return
+            yield
+
+        self.client.aio.models.generate_content_stream.side_effect = lambda **kwargs: stream()
+        Path("chat").mkdir()
+        self.client.writer = IoUringBatchEngine()
+        self.client.open_response()
+        response = asyncio.run(self.client.respond_stream_async("hello"))
+        self.client.writer.close()
+        self.client.close_response()
+        self.assertEqual(response, "No response received.")
+        self.assertEqual(Path("chat/response.csv").read_text(encoding="utf-8"), "No response received.")
@@ -5,6 +5,8 @@ Log class, including info, error, and critical logging levels.
 """
 
 import unittest
+import tempfile
+import os
 from pathlib import Path
 from src.lib.log import Log
 
@@ -31,6 +33,7 @@ class TestLog(unittest.TestCase):
     def test_info_logging(self):
         self.log.info("This is an info message.")
         from pathlib import Path
+        self.log.flush()
         log_path = Path("log") / self.LOG_FILE
         with log_path.open("r", encoding="utf-8") as f:
             content = f.read()
@@ -43,6 +46,7 @@ class TestLog(unittest.TestCase):
         except ZeroDivisionError:
             self.log.error("ZeroDivisionError occurred")
         from pathlib import Path
+        self.log.flush()
         log_path = Path("log") / self.LOG_FILE
         with log_path.open("r", encoding="utf-8") as f:
             content = f.read()
@@ -50,15 +54,88 @@ class TestLog(unittest.TestCase):
         self.assertIn("ZeroDivisionError", content)
         self.assertIn("ZeroDivisionError occurred", content)
 
+    def test_error_row_matches_header(self):
+        try:
+            _ = 1 / 0
+        except ZeroDivisionError:
+            self.log.error("ZeroDivisionError occurred")
+        self.log.flush()
+        log_path = Path("log") / self.LOG_FILE
+        with log_path.open("r", encoding="utf-8") as f:
+            header, row = f.read().splitlines()
+        fields = dict(zip(header.split(","), row.split(",")))
+        self.assertEqual(fields["LEVEL"], "ERROR")
+        self.assertEqual(fields["MESSAGE"], "ZeroDivisionError occurred")
+        self.assertEqual(fields["ERROR"], "ZeroDivisionError")
+        self.assertEqual(fields["FILE"], "log_test.py")
+
     def test_critical_logging(self):
         try:
             raise ValueError("This is a critical error.")
         except ValueError:
             self.log.critical("Critical error occurred")
         from pathlib import Path
+        self.log.flush()
         log_path = Path("log") / self.LOG_FILE
         with log_path.open("r", encoding="utf-8") as f:
             content = f.read()
         self.assertIn("CRITICAL", content)
         self.assertIn("ValueError", content)
-        self.assertIn("Critical error occurred", content)
\ No newline at end of file
+        self.assertIn("Critical error occurred", content)
+
+    def test_records_are_buffered_until_flush(self):
+        self.log.info("Buffered message")
+        log_path = Path("log") / self.LOG_FILE
+        self.assertNotIn("Buffered message", log_path.read_text(encoding="utf-8"))
+        self.log.flush()
+        self.assertIn("Buffered message", log_path.read_text(encoding="utf-8"))
+
+    def test_critical_record_flushes_buffer(self):
+        self.log.info("Buffered message")
+        try:
+            raise ValueError("This is a critical error.")
+        except ValueError:
+            self.log.critical("Critical error occurred")
+        log_path = Path("log") / self.LOG_FILE
+        content = log_path.read_text(encoding="utf-8")
+        self.assertIn("Buffered message", content)
+        self.assertIn("Critical error occurred", content)
+
+    def test_message_is_escaped_for_csv(self):
+        self.log.info("first, second\nthird")
+        self.log.flush()
+        log_path = Path("log") / self.LOG_FILE
+        with log_path.open("r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines[-1].endswith("INFO,first. second third,,,"))
+
+    def test_critical_logging_with_exception_instance(self):
+        try:
+            raise KeyError("missing")
+        except KeyError as e:
+            error = e
+        self.log.critical("Critical error occurred", exc=error)
+        log_path = Path("log") / self.LOG_FILE
+        with log_path.open("r", encoding="utf-8") as f:
+            content = f.read()
+        self.assertIn("CRITICAL,Critical error occurred,KeyError,log_test.py", content)
+
+    def test_error_logging_without_exception(self):
+        self.log.error("Nothing was raised")
+        self.log.flush()
+        log_path = Path("log") / self.LOG_FILE
+        with log_path.open("r", encoding="utf-8") as f:
+            content = f.read()
+        self.assertIn("ERROR,Nothing was raised,None,,", content)
+
+    def test_handler_is_reused_through_symlinked_directory(self):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.chdir(tmp_dir)
+            try:
+                os.mkdir("real_log")
+                os.symlink("real_log", "log")
+                handler = Log(self.LOG_FILE)._handler
+                self.assertIs(Log(self.LOG_FILE)._handler, handler)
+            finally:
+                os.chdir(cwd)
@@ -1,4 +1,6 @@
+from src.tests.batch_io_test import *
 from src.tests.gemini_test import *
+from src.tests.gemini_tool_test import *
 from src.tests.log_test import *
 
 if __name__ == '__main__':